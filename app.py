@@ -3,29 +3,151 @@ Flask web application for LEGO Set to STL converter.
 Provides web interface for converting LEGO sets to 3D-printable STL files.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_file, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 import os
 import zipfile
-from io import BytesIO
 import threading
-from datetime import datetime
-
-from rebrickable import RebrickableClient
-from metadata import MetadataHandler
-from converter import STLConverter
+import sys
+import atexit
+import logging
+import queue
+import unicodedata
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+from urllib.parse import quote
+from werkzeug.http import dump_options_header
+
+from converter import IO_BUFFER_SIZE
+from pipeline import (
+    get_rebrickable_client,
+    metadata_handler,
+    stl_converter,
+    processing_status,
+    process_set_background
+)
+
+try:
+    import orjson
+except ImportError:  # Fall back to Flask's stdlib-based provider
+    orjson = None
+
+
+# Log through a queue so conversion worker threads never block on stdout;
+# a single listener thread writes the records out
+log_queue = queue.SimpleQueue()
+logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[QueueHandler(log_queue)])
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        # Dates go through Flask's default hook, which formats them as HTTP dates
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'lego-stl-converter-secret-key'
 app.config['SETS_DIR'] = 'sets'
 
-# Initialize modules
-rebrickable_client = RebrickableClient()
-metadata_handler = MetadataHandler()
-stl_converter = STLConverter()
+# Encode every jsonify response (including the polled status endpoint) with orjson
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Let a reverse proxy send STL files instead of streaming them through Python:
+# USE_X_SENDFILE for Apache/lighttpd, X_ACCEL_REDIRECT_PREFIX for an nginx
+# internal location that aliases the sets directory (e.g. "/internal-sets/")
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+app.config['STL_MAX_AGE'] = 3600
+
+# Hand processing off to Celery workers when a broker is configured. Workers
+# report status through Redis, so without REDIS_URL the web process would
+# never see their progress; process in threads instead
+if os.environ.get('CELERY_BROKER_URL') and os.environ.get('REDIS_URL'):
+    from tasks import process_set_task
+else:
+    if os.environ.get('CELERY_BROKER_URL'):
+        logger.warning("⚠ Warning: CELERY_BROKER_URL is set without REDIS_URL, processing sets in threads instead")
+    process_set_task = None
+
+
+class ZipStream:
+    """Write-only file object that buffers ZIP output until it is drained."""
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        """Return and clear everything written so far."""
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def conditional_response(etag: str, last_modified: float) -> Response:
+    """
+    Create a response carrying cache validators, evaluated against the request.
+    
+    The returned response has status 304 if the client's copy is current;
+    otherwise the caller fills in the body.
+    
+    Args:
+        etag: Entity tag for the resource
+        last_modified: Modification time as a Unix timestamp
+        
+    Returns:
+        Response with ETag, Last-Modified and Cache-Control set
+    """
+    response = Response()
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+    # Always revalidate so newly converted STLs show up
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 
-# Store processing status for sets
-processing_status = {}
+def attachment_header(download_name: str) -> str:
+    """
+    Build a Content-Disposition value for downloading a file.
+    
+    Quotes the filename and, for non-ASCII names, adds an RFC 5987
+    ``filename*`` parameter the same way Flask's send_file does.
+    
+    Args:
+        download_name: Filename the browser should save as
+        
+    Returns:
+        Content-Disposition header value
+    """
+    try:
+        download_name.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        quoted = quote(download_name, safe="!#$&+^`|~")
+        return dump_options_header('attachment', {'filename': simple, 'filename*': f"UTF-8''{quoted}"})
+    return dump_options_header('attachment', {'filename': download_name})
 
 
 @app.route('/')
@@ -54,7 +176,7 @@ def validate_set(set_number):
         })
     
     # Validate with Rebrickable
-    metadata = rebrickable_client.validate_set(set_number)
+    metadata = get_rebrickable_client().validate_set(set_number)
     
     if metadata:
         return jsonify({
@@ -90,27 +212,43 @@ def process_set(set_number):
             'redirect': f'/set/{set_number}'
         })
     
-    # Check if already processing
-    if set_number in processing_status and processing_status[set_number]['status'] == 'processing':
-        return jsonify({
-            'success': False,
-            'message': f'Set {set_number} is already being processed'
-        })
-    
-    # Initialize processing status
-    processing_status[set_number] = {
+    # Initialize processing status, unless already processing
+    started = processing_status.start(set_number, {
         'status': 'processing',
         'progress': 0,
         'message': 'Starting...',
         'started_at': datetime.now().isoformat()
-    }
+    })
     
-    # Process in background thread
-    thread = threading.Thread(
-        target=process_set_background,
-        args=(set_number,)
-    )
-    thread.start()
+    if not started:
+        return jsonify({
+            'success': False,
+            'message': f'Set {set_number} is already being processed'
+        })
+    
+    if process_set_task is not None:
+        # Process in a Celery worker
+        try:
+            task = process_set_task.delay(set_number)
+        except Exception as e:
+            processing_status.update(
+                set_number,
+                status='failed',
+                message=f'Error: {str(e)}'
+            )
+            return jsonify({
+                'success': False,
+                'message': f'Could not queue set {set_number} for processing'
+            }), 503
+        
+        processing_status.update(set_number, task_id=task.id)
+    else:
+        # Process in background thread
+        thread = threading.Thread(
+            target=process_set_background,
+            args=(set_number,)
+        )
+        thread.start()
     
     return jsonify({
         'success': True,
@@ -119,63 +257,6 @@ def process_set(set_number):
     })
 
 
-def process_set_background(set_number: str):
-    """
-    Background task to process a set.
-    
-    Args:
-        set_number: The LEGO set number
-    """
-    try:
-        # Update status
-        processing_status[set_number]['message'] = 'Fetching set data from Rebrickable...'
-        processing_status[set_number]['progress'] = 10
-        
-        # Step 1: Fetch data from Rebrickable
-        data = rebrickable_client.fetch_set_data(set_number)
-        
-        if not data:
-            processing_status[set_number]['status'] = 'failed'
-            processing_status[set_number]['message'] = 'Failed to fetch set data'
-            return
-        
-        # Update status
-        processing_status[set_number]['message'] = 'Creating metadata file...'
-        processing_status[set_number]['progress'] = 30
-        
-        # Step 2: Create metadata
-        success = metadata_handler.create_set_metadata(
-            set_number,
-            data['metadata'],
-            data['parts']
-        )
-        
-        if not success:
-            processing_status[set_number]['status'] = 'failed'
-            processing_status[set_number]['message'] = 'Failed to create metadata'
-            return
-        
-        # Update status
-        processing_status[set_number]['message'] = 'Converting parts to STL...'
-        processing_status[set_number]['progress'] = 50
-        
-        # Step 3: Convert parts to STL
-        metadata = metadata_handler.load_set_metadata(set_number)
-        stats = stl_converter.convert_set(set_number, metadata['parts'])
-        
-        # Update final status
-        processing_status[set_number]['status'] = 'completed'
-        processing_status[set_number]['progress'] = 100
-        processing_status[set_number]['message'] = f'Completed! Converted {stats["converted"]} parts'
-        processing_status[set_number]['stats'] = stats
-        processing_status[set_number]['completed_at'] = datetime.now().isoformat()
-        
-    except Exception as e:
-        processing_status[set_number]['status'] = 'failed'
-        processing_status[set_number]['message'] = f'Error: {str(e)}'
-        print(f"Error processing set {set_number}: {e}")
-
-
 @app.route('/api/status/<set_number>')
 def get_status(set_number):
     """
@@ -187,8 +268,10 @@ def get_status(set_number):
     Returns:
         JSON with current status
     """
-    if set_number in processing_status:
-        return jsonify(processing_status[set_number])
+    status = processing_status.get(set_number)
+    
+    if status is not None:
+        return jsonify(status)
     else:
         return jsonify({
             'status': 'unknown',
@@ -207,16 +290,44 @@ def view_set(set_number):
     Returns:
         Rendered template with set information
     """
+    set_dir = os.path.join(app.config['SETS_DIR'], set_number)
+    
+    # The page changes when the metadata or the set of STL files changes
+    try:
+        mtimes = [os.stat(os.path.join(set_dir, '.set.json')).st_mtime_ns]
+    except OSError:
+        return render_template('error.html', message=f'Set {set_number} not found'), 404
+    
+    try:
+        mtimes.append(os.stat(os.path.join(set_dir, 'stls')).st_mtime_ns)
+    except OSError:
+        pass
+    
+    response = conditional_response(
+        f'{set_number}-{"-".join(map(str, mtimes))}',
+        max(mtimes) / 1e9
+    )
+    
+    if response.status_code == 304:
+        return response
+    
     metadata = metadata_handler.load_set_metadata(set_number)
     
     if not metadata:
         return render_template('error.html', message=f'Set {set_number} not found'), 404
     
-    # Check which STL files exist
-    for part in metadata['parts']:
-        part['stl_exists'] = stl_converter.stl_exists(set_number, part['part_num'])
+    # Check which STL files exist, without mutating the cached metadata
+    stl_parts = stl_converter.list_stls(set_number)
+    set_data = {
+        **metadata,
+        'parts': [
+            {**part, 'stl_exists': part['part_num'] in stl_parts}
+            for part in metadata['parts']
+        ]
+    }
     
-    return render_template('set.html', set_data=metadata)
+    response.set_data(render_template('set.html', set_data=set_data))
+    return response
 
 
 @app.route('/download/<set_number>/<part_number>')
@@ -236,10 +347,23 @@ def download_part(set_number, part_number):
     if not os.path.exists(stl_path):
         return jsonify({'error': 'STL file not found'}), 404
     
+    download_name = f'{set_number}_{part_number}.stl'
+    accel_prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+    
+    if accel_prefix:
+        # nginx serves the file itself from its internal location
+        return Response(headers={
+            'X-Accel-Redirect': f"{accel_prefix.rstrip('/')}/{quote(set_number)}/stls/{quote(part_number)}.stl",
+            'Content-Type': 'model/stl',
+            'Content-Disposition': attachment_header(download_name)
+        })
+    
     return send_file(
-        stl_path,
+        os.path.abspath(stl_path),
         as_attachment=True,
-        download_name=f'{set_number}_{part_number}.stl'
+        download_name=download_name,
+        conditional=True,
+        max_age=app.config['STL_MAX_AGE']
     )
 
 
@@ -248,6 +372,9 @@ def download_set_zip(set_number):
     """
     Download all STL files for a set as a ZIP archive.
     
+    Pass ``?compression=0`` to store STL files uncompressed for faster
+    bulk downloads.
+    
     Args:
         set_number: The LEGO set number
         
@@ -259,30 +386,52 @@ def download_set_zip(set_number):
     if not metadata:
         return jsonify({'error': 'Set not found'}), 404
     
-    # Create ZIP file in memory
-    memory_file = BytesIO()
+    set_dir = os.path.join(app.config['SETS_DIR'], set_number)
+    
+    # STL output is highly redundant, so the fastest deflate level loses little
+    stl_compression = zipfile.ZIP_DEFLATED
+    if request.args.get('compression') == '0':
+        stl_compression = zipfile.ZIP_STORED
     
-    with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # Add .set.json metadata
-        json_path = os.path.join(app.config['SETS_DIR'], set_number, '.set.json')
-        zf.write(json_path, f'{set_number}/.set.json')
+    def generate():
+        # Stream the archive as it is built instead of buffering it whole
+        stream = ZipStream()
         
-        # Add all STL files
-        stl_dir = os.path.join(app.config['SETS_DIR'], set_number, 'stls')
+        with zipfile.ZipFile(stream, 'w', stl_compression, compresslevel=1) as zf:
+            # Add .set.json metadata
+            json_path = os.path.join(set_dir, '.set.json')
+            zf.write(json_path, f'{set_number}/.set.json', compress_type=zipfile.ZIP_DEFLATED)
+            yield stream.drain()
+            
+            # Add all STL files, copying in large chunks
+            stl_dir = os.path.join(set_dir, 'stls')
+            
+            if os.path.isdir(stl_dir):
+                with os.scandir(stl_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.stl') and entry.is_file(follow_symlinks=False):
+                            # Keep the file's mtime and permissions, like zf.write
+                            zinfo = zipfile.ZipInfo.from_file(entry.path, f'{set_number}/stls/{entry.name}')
+                            zinfo.compress_type = stl_compression
+                            zinfo._compresslevel = 1
+                            
+                            with open(entry.path, 'rb', buffering=IO_BUFFER_SIZE) as src, \
+                                    zf.open(zinfo, 'w') as dst:
+                                while True:
+                                    chunk = src.read(IO_BUFFER_SIZE)
+                                    if not chunk:
+                                        break
+                                    dst.write(chunk)
+                                    yield stream.drain()
+                            yield stream.drain()
         
-        if os.path.exists(stl_dir):
-            for filename in os.listdir(stl_dir):
-                if filename.endswith('.stl'):
-                    file_path = os.path.join(stl_dir, filename)
-                    zf.write(file_path, f'{set_number}/stls/{filename}')
+        # Central directory is written when the archive is closed
+        yield stream.drain()
     
-    memory_file.seek(0)
-    
-    return send_file(
-        memory_file,
+    return Response(
+        generate(),
         mimetype='application/zip',
-        as_attachment=True,
-        download_name=f'{set_number}_stls.zip'
+        headers={'Content-Disposition': attachment_header(f'{set_number}_stls.zip')}
     )
 
 
@@ -297,18 +446,20 @@ def list_sets():
     sets = []
     sets_dir = app.config['SETS_DIR']
     
-    if os.path.exists(sets_dir):
-        for set_number in os.listdir(sets_dir):
-            metadata = metadata_handler.load_set_metadata(set_number)
-            if metadata:
-                sets.append({
-                    'set_number': set_number,
-                    'name': metadata['name'],
-                    'total_parts': metadata['total_parts'],
-                    'unique_parts': metadata['unique_parts']
-                })
-    
-    return jsonify({'sets': sets})
+    if os.path.isdir(sets_dir):
+        with os.scandir(sets_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                
+                summary = metadata_handler.load_set_summary(entry.name)
+                if summary:
+                    sets.append({**summary, 'set_number': entry.name})
+    
+    response = jsonify({'sets': sets})
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route('/static/<path:filename>')
@@ -5,10 +5,90 @@ Uses the ldraw2stl tool via subprocess.
 
 import subprocess
 import os
-import platform
+import logging
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Callable, Tuple
 import shutil
+import struct
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+logger = logging.getLogger(__name__)
+
+# Binary STL facet: normal, three vertices, attribute byte count
+STL_FACET = struct.Struct('<12fH')
+STL_HEADER_SIZE = 80
+
+# Buffer size for reading and writing large files
+IO_BUFFER_SIZE = 256 * 1024
+
+# Wrapper that runs dat2stl repeatedly inside one perl process
+DAT2STL_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dat2stl_server.pl")
+
+
+class PerlWorker:
+    """A long-running perl process that converts parts sent over stdin."""
+    
+    def __init__(self, ldraw2stl_bin: str):
+        """
+        Start a dat2stl server process.
+        
+        Args:
+            ldraw2stl_bin: Path to the dat2stl script to run for each part
+        """
+        self.timed_out = False
+        self.proc = subprocess.Popen(
+            ["perl", DAT2STL_SERVER, ldraw2stl_bin],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+    
+    def convert(self, output_path: str, args: List[str], timeout: float = 60) -> Tuple[bool, str]:
+        """
+        Run dat2stl once, writing its output to a file.
+        
+        Args:
+            output_path: Path the STL output is written to
+            args: Command line arguments for dat2stl
+            timeout: Seconds to wait before killing the worker
+            
+        Returns:
+            Tuple of (success, error message)
+        """
+        timer = threading.Timer(timeout, self._kill)
+        timer.start()
+        try:
+            self.proc.stdin.write("\t".join([output_path, *args]) + "\n")
+            self.proc.stdin.flush()
+            reply = self.proc.stdout.readline()
+        finally:
+            timer.cancel()
+        
+        if self.timed_out:
+            raise subprocess.TimeoutExpired(self.proc.args, timeout)
+        if not reply:
+            raise RuntimeError("dat2stl worker exited unexpectedly")
+        
+        status, _, message = reply.rstrip("\n").partition("\t")
+        return status == "OK", message
+    
+    def _kill(self):
+        """Kill the worker after a timeout."""
+        self.timed_out = True
+        self.proc.kill()
+    
+    def close(self):
+        """Stop the worker process."""
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
 
 
 class STLConverter:
@@ -18,7 +98,9 @@ class STLConverter:
         self,
         ldraw_dir: str = "ldraw",
         ldraw2stl_bin: str = "ldraw2stl/bin/dat2stl",
-        output_base_dir: str = "sets"
+        output_base_dir: str = "sets",
+        max_workers: Optional[int] = None,
+        persistent_workers: bool = True
     ):
         """
         Initialize the STL converter.
@@ -27,15 +109,44 @@ class STLConverter:
             ldraw_dir: Path to the LDraw library directory
             ldraw2stl_bin: Path to the dat2stl executable
             output_base_dir: Base directory for set outputs
+            max_workers: Number of parallel conversions (default: CPU count)
+            persistent_workers: Reuse long-running perl processes for conversions
+                instead of starting perl once per part
         """
         self.ldraw_dir = os.path.abspath(ldraw_dir)
         self.ldraw2stl_bin = ldraw2stl_bin
         self.output_base_dir = output_base_dir
-        self.is_windows = platform.system() == "Windows"
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.persistent_workers = persistent_workers
+        
+        # Idle perl workers, started on demand
+        self._workers = queue.Queue()
+        
+        # Index the library once so part lookups don't hit the filesystem
+        self._dat_index = self._index_parts()
         
         # Check if Perl is available
         self._check_perl()
     
+    def _index_parts(self) -> Dict[str, str]:
+        """
+        Index the .dat files in the LDraw parts directory.
+        
+        Returns:
+            Dictionary mapping lowercase part number to the .dat filename
+        """
+        parts_dir = os.path.join(self.ldraw_dir, "parts")
+        
+        try:
+            return {
+                filename[:-4].lower(): filename
+                for filename in os.listdir(parts_dir)
+                if filename.lower().endswith(".dat")
+            }
+        except OSError as e:
+            logger.warning("⚠ Warning: Could not index LDraw parts: %s", e)
+            return {}
+    
     def _check_perl(self) -> bool:
         """Check if Perl is installed and accessible."""
         try:
@@ -46,40 +157,48 @@ class STLConverter:
                 timeout=5
             )
             if result.returncode == 0:
-                print("✓ Perl is available")
+                logger.info("✓ Perl is available")
                 return True
             else:
-                print("⚠ Warning: Perl not found. Install Strawberry Perl on Windows.")
+                logger.warning("⚠ Warning: Perl not found. Install Strawberry Perl on Windows.")
                 return False
         except Exception as e:
-            print(f"⚠ Warning: Could not check Perl: {e}")
+            logger.warning("⚠ Warning: Could not check Perl: %s", e)
             return False
     
     def part_exists(self, part_number: str) -> bool:
         """
         Check if a part .dat file exists in the LDraw library.
         
+        Lookups are case-insensitive against the index built at startup.
+        
         Args:
             part_number: The part number (e.g., "3024")
             
         Returns:
             True if part exists, False otherwise
         """
-        part_path = os.path.join(self.ldraw_dir, "parts", f"{part_number}.dat")
-        exists = os.path.exists(part_path)
-        
-        if not exists:
-            # Try with lowercase
-            part_path = os.path.join(self.ldraw_dir, "parts", f"{part_number.lower()}.dat")
-            exists = os.path.exists(part_path)
+        return part_number.lower() in self._dat_index
+    
+    def get_part_file(self, part_number: str) -> str:
+        """
+        Get the path to a part's .dat file in the LDraw library.
         
-        return exists
+        Args:
+            part_number: The part number (e.g., "3024")
+            
+        Returns:
+            Path to the .dat file, using the filename as it exists on disk
+        """
+        filename = self._dat_index.get(part_number.lower(), f"{part_number}.dat")
+        return os.path.join(self.ldraw_dir, "parts", filename)
     
     def convert_part(
         self,
         part_number: str,
         output_path: str,
-        use_cache: bool = True
+        use_cache: bool = True,
+        check_exists: bool = True
     ) -> bool:
         """
         Convert a single LDraw .dat file to STL.
@@ -88,89 +207,178 @@ class STLConverter:
             part_number: The part number (e.g., "3024")
             output_path: Full path for the output STL file
             use_cache: Whether to use caching (recommended)
+            check_exists: Check the part exists first (skip if already checked)
             
         Returns:
             True if successful, False otherwise
         """
         # Check if part exists
-        if not self.part_exists(part_number):
-            print(f"⚠ Warning: Part {part_number}.dat not found in LDraw library")
+        if check_exists and not self.part_exists(part_number):
+            logger.warning("⚠ Warning: Part %s.dat not found in LDraw library", part_number)
             return False
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         # Build command
-        part_file = os.path.join(self.ldraw_dir, "parts", f"{part_number}.dat")
+        part_file = self.get_part_file(part_number)
         
-        cmd = [
-            "perl",
-            self.ldraw2stl_bin,
+        args = [
             "--file", part_file,
             "--ldrawdir", self.ldraw_dir
         ]
         
         if use_cache:
-            cmd.append("--cache")
+            args.append("--cache")
+        
+        cmd = ["perl", self.ldraw2stl_bin, *args]
+        
+        # dat2stl emits ASCII STL; it is converted to binary once finished.
+        # The binary is written next to the output and only moved into place
+        # when complete, so a failed conversion never leaves a partial STL
+        ascii_path = f"{output_path}.ascii"
+        binary_path = f"{output_path}.tmp"
         
         try:
             # Run conversion
-            if self.is_windows:
-                # On Windows, use PowerShell's Out-File with ASCII encoding
-                # Run perl command and capture output
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=False,  # Get binary output
-                    timeout=60
-                )
+            if self.persistent_workers:
+                success, error = self._convert_in_worker(ascii_path, args)
                 
-                if result.returncode != 0:
-                    stderr = result.stderr.decode('utf-8', errors='ignore')
-                    print(f"✗ Error converting {part_number}: {stderr}")
+                if not success:
+                    logger.error("✗ Error converting %s: %s", part_number, error)
                     return False
-                
-                # Write output to file (ASCII encoding for STL)
-                with open(output_path, 'wb') as f:
-                    f.write(result.stdout)
             else:
-                # On Unix-like systems, use shell redirection
-                with open(output_path, 'w') as f:
+                # Send output straight to the file; capturing it would hold
+                # the whole ASCII STL in memory first
+                with open(ascii_path, 'wb') as f:
                     result = subprocess.run(
                         cmd,
                         stdout=f,
                         stderr=subprocess.PIPE,
-                        text=True,
                         timeout=60
                     )
                 
                 if result.returncode != 0:
-                    print(f"✗ Error converting {part_number}: {result.stderr}")
+                    stderr = result.stderr.decode('utf-8', errors='ignore')
+                    logger.error("✗ Error converting %s: %s", part_number, stderr)
                     return False
             
-            print(f"✓ Converted {part_number}.dat → {os.path.basename(output_path)}")
+            self._write_binary_stl(ascii_path, binary_path)
+            os.replace(binary_path, output_path)
+            
+            logger.info("✓ Converted %s.dat → %s", part_number, os.path.basename(output_path))
             return True
             
         except subprocess.TimeoutExpired:
-            print(f"✗ Timeout converting {part_number}")
+            logger.error("✗ Timeout converting %s", part_number)
             return False
         except Exception as e:
-            print(f"✗ Error converting {part_number}: {e}")
+            logger.error("✗ Error converting %s: %s", part_number, e)
             return False
+        finally:
+            for temp_path in (ascii_path, binary_path):
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+    
+    def _convert_in_worker(self, output_path: str, args: List[str]) -> Tuple[bool, str]:
+        """
+        Run dat2stl in an idle persistent worker, starting one if needed.
+        
+        Args:
+            output_path: Path the STL output is written to
+            args: Command line arguments for dat2stl
+            
+        Returns:
+            Tuple of (success, error message)
+        """
+        try:
+            worker = self._workers.get_nowait()
+        except queue.Empty:
+            worker = PerlWorker(self.ldraw2stl_bin)
+        
+        try:
+            result = worker.convert(output_path, args)
+        except Exception:
+            # The worker is dead or stuck; don't hand it out again
+            worker.close()
+            raise
+        
+        self._workers.put(worker)
+        return result
+    
+    def close(self):
+        """Stop all idle persistent workers."""
+        while True:
+            try:
+                self._workers.get_nowait().close()
+            except queue.Empty:
+                break
+    
+    def _write_binary_stl(self, ascii_path: str, output_path: str) -> int:
+        """
+        Convert an ASCII STL file to binary STL.
+        
+        Binary STL stores each triangle in 50 bytes, several times smaller
+        than the ASCII form, which also cuts the work of zipping a set.
+        
+        Args:
+            ascii_path: Path to the ASCII STL input
+            output_path: Path for the binary STL output
+            
+        Returns:
+            Number of triangles written
+        """
+        count = 0
+        normal = None
+        vertices = []
+        
+        with open(ascii_path, 'rb', buffering=IO_BUFFER_SIZE) as src, \
+                open(output_path, 'wb', buffering=IO_BUFFER_SIZE) as dst:
+            header = b'Binary STL converted from LDraw by ldraw2stl'
+            dst.write(header.ljust(STL_HEADER_SIZE, b'\0'))
+            dst.write(struct.pack('<I', 0))  # Triangle count, patched below
+            
+            for line in src:
+                tokens = line.split()
+                if not tokens:
+                    continue
+                
+                keyword = tokens[0]
+                if keyword == b'facet':
+                    # facet normal nx ny nz
+                    normal = tokens[2:5]
+                    vertices = []
+                elif keyword == b'vertex':
+                    vertices.extend(tokens[1:4])
+                elif keyword == b'endfacet':
+                    if normal is None or len(vertices) != 9:
+                        raise ValueError(f"Malformed facet in {ascii_path}")
+                    dst.write(STL_FACET.pack(*map(float, normal), *map(float, vertices), 0))
+                    count += 1
+                    normal = None
+            
+            dst.seek(STL_HEADER_SIZE)
+            dst.write(struct.pack('<I', count))
+        
+        return count
     
     def convert_set(
         self,
         set_number: str,
         parts: List[Dict[str, any]],
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, any]:
         """
         Convert all parts for a LEGO set.
         
+        Parts are converted concurrently, one perl subprocess per worker.
+        
         Args:
             set_number: The LEGO set number
             parts: List of part dictionaries from metadata
             skip_existing: Skip parts that already have STL files
+            progress_callback: Called with (done, total) as each part finishes
             
         Returns:
             Dictionary with conversion statistics
@@ -187,25 +395,22 @@ class STLConverter:
             'failed_parts': []
         }
         
-        # Get unique parts (avoid converting same part multiple times)
-        unique_parts = {}
-        for part in parts:
-            part_num = part['part_num']
-            if part_num not in unique_parts:
-                unique_parts[part_num] = part
+        # Get unique part numbers in first-seen order (avoid converting same part multiple times)
+        unique_parts = dict.fromkeys(part['part_num'] for part in parts)
         
         stats['total'] = len(unique_parts)
         
-        print(f"\nConverting {stats['total']} unique parts for set {set_number}...")
-        print("=" * 60)
+        logger.info("Converting %d unique parts for set %s...", stats['total'], set_number)
         
-        for part_num, part_data in unique_parts.items():
+        # Filter out skipped and missing parts before dispatching work
+        to_convert = {}
+        for part_num in unique_parts:
             output_path = os.path.join(stl_dir, f"{part_num}.stl")
             
             # Skip if already exists
             if skip_existing and os.path.exists(output_path):
                 stats['skipped'] += 1
-                print(f"⊘ Skipped {part_num} (already exists)")
+                logger.info("⊘ Skipped %s (already exists)", part_num)
                 continue
             
             # Check if part exists in library
@@ -217,32 +422,49 @@ class STLConverter:
                 })
                 continue
             
-            # Convert the part
-            success = self.convert_part(part_num, output_path)
+            to_convert[part_num] = output_path
+        
+        done = stats['total'] - len(to_convert)
+        if progress_callback:
+            progress_callback(done, stats['total'])
+        
+        # Convert the parts in parallel; the work happens in perl subprocesses
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.convert_part, part_num, output_path, check_exists=False
+                ): part_num
+                for part_num, output_path in to_convert.items()
+            }
             
-            if success:
-                stats['converted'] += 1
-            else:
-                stats['failed'] += 1
-                stats['failed_parts'].append({
-                    'part_num': part_num,
-                    'reason': 'Conversion failed'
-                })
+            for future in as_completed(futures):
+                part_num = futures[future]
+                
+                if future.result():
+                    stats['converted'] += 1
+                else:
+                    stats['failed'] += 1
+                    stats['failed_parts'].append({
+                        'part_num': part_num,
+                        'reason': 'Conversion failed'
+                    })
+                
+                done += 1
+                if progress_callback:
+                    progress_callback(done, stats['total'])
         
-        print("=" * 60)
-        print(f"\nConversion Summary:")
-        print(f"  Total unique parts: {stats['total']}")
-        print(f"  ✓ Converted: {stats['converted']}")
-        print(f"  ⊘ Skipped: {stats['skipped']}")
-        print(f"  ✗ Failed: {stats['failed']}")
-        print(f"  ⚠ Missing: {stats['missing']}")
+        logger.info(
+            "Conversion summary for set %s: %d unique parts, "
+            "✓ %d converted, ⊘ %d skipped, ✗ %d failed, ⚠ %d missing",
+            set_number, stats['total'], stats['converted'],
+            stats['skipped'], stats['failed'], stats['missing']
+        )
         
         if stats['failed_parts']:
-            print(f"\nFailed parts:")
             for failed in stats['failed_parts'][:10]:  # Show first 10
-                print(f"  - {failed['part_num']}: {failed['reason']}")
+                logger.warning("  Failed part %s: %s", failed['part_num'], failed['reason'])
             if len(stats['failed_parts']) > 10:
-                print(f"  ... and {len(stats['failed_parts']) - 10} more")
+                logger.warning("  ... and %d more failed parts", len(stats['failed_parts']) - 10)
         
         return stats
     
@@ -271,9 +493,31 @@ class STLConverter:
             True if STL exists, False otherwise
         """
         return os.path.exists(self.get_stl_path(set_number, part_number))
+    
+    def list_stls(self, set_number: str) -> Set[str]:
+        """
+        Get the part numbers that have STL files for a set.
+        
+        Reads the directory once instead of checking each part separately.
+        
+        Args:
+            set_number: The LEGO set number
+            
+        Returns:
+            Set of part numbers with an STL file
+        """
+        stl_dir = os.path.join(self.output_base_dir, set_number, "stls")
+        
+        try:
+            with os.scandir(stl_dir) as entries:
+                return {entry.name[:-4] for entry in entries if entry.name.endswith(".stl")}
+        except FileNotFoundError:
+            return set()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Test the converter
     converter = STLConverter()
     
@@ -0,0 +1,67 @@
+#!/usr/bin/perl
+#
+# Persistent wrapper around ldraw2stl's dat2stl script.
+#
+# Runs dat2stl in-process for every request so one perl interpreter (and
+# its loaded modules) is reused across many parts instead of paying the
+# interpreter startup cost per part.
+#
+# Usage: perl dat2stl_server.pl <path/to/dat2stl>
+#
+# Protocol (one line per request on STDIN, tab-separated):
+#   <output path> <dat2stl arg> <dat2stl arg> ...
+# One line is written back per request on STDOUT:
+#   OK
+#   ERR<tab><message>
+
+use strict;
+use warnings;
+use File::Spec;
+
+my $script;
+
+BEGIN {
+    $script = shift @ARGV or die "usage: $0 <path/to/dat2stl>\n";
+
+    # Turn exit() inside dat2stl into an exception so the server keeps running
+    *CORE::GLOBAL::exit = sub {
+        die bless { code => $_[0] // 0 }, 'Dat2STL::Exit';
+    };
+}
+
+$script = File::Spec->rel2abs($script);
+-f $script or die "dat2stl not found: $script\n";
+
+# Keep a handle on the real STDOUT for replies; STDOUT itself is pointed
+# at each output file while dat2stl runs
+open(my $reply, '>&', \*STDOUT) or die "Cannot dup STDOUT: $!\n";
+$reply->autoflush(1);
+
+while (my $line = <STDIN>) {
+    chomp $line;
+    my ($output, @args) = split /\t/, $line;
+    next unless defined $output && length $output;
+
+    my $ok = eval {
+        open(STDOUT, '>', $output) or die "Cannot open $output: $!\n";
+        local @ARGV = @args;
+        local $0 = $script;
+        do $script;
+        die $@ if $@;
+        1;
+    };
+    my $error = $@;
+    close(STDOUT);
+
+    if (!$ok && ref $error eq 'Dat2STL::Exit') {
+        $ok = $error->{code} == 0;
+        $error = "dat2stl exited with status $error->{code}";
+    }
+
+    if ($ok) {
+        print $reply "OK\n";
+    } else {
+        $error =~ s/\s+/ /g;
+        print $reply "ERR\t$error\n";
+    }
+}
@@ -6,50 +6,159 @@ Handles color mapping and set information storage.
 import json
 import csv
 import os
-from typing import Dict, List, Optional
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, NamedTuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+
+# Bump when the cached colors format changes to invalidate old caches
+COLORS_CACHE_VERSION = 2
+
+# Parsed files kept in memory, least recently used evicted first. Full
+# metadata holds every part of a set, summaries only a few fields
+METADATA_CACHE_SIZE = 32
+SUMMARY_CACHE_SIZE = 1024
+
+
+def write_json(path: str, data: Dict):
+    """Write data to a JSON file, indented, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def read_json(path: str) -> Dict:
+    """Read a JSON file, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ColorInfo(NamedTuple):
+    """Color information for a single color ID."""
+    name: str
+    rgb: str
+    is_trans: bool
+
 
 class MetadataHandler:
     """Handles creation and management of set metadata files."""
     
-    def __init__(self, colors_csv_path: str = "colors.csv"):
+    def __init__(
+        self,
+        colors_csv_path: str = "colors.csv",
+        colors_cache_path: str = "colors.cache.pkl"
+    ):
         """
         Initialize the metadata handler.
         
         Args:
             colors_csv_path: Path to the colors.csv file
+            colors_cache_path: Path to the parsed colors cache file
         """
         self.colors_csv_path = colors_csv_path
+        self.colors_cache_path = colors_cache_path
         self.colors_map = self._load_colors()
+        
+        # Parsed files keyed by path: (mtime_ns, size, data), in LRU order
+        self._metadata_cache = OrderedDict()
+        self._summary_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
-    def _load_colors(self) -> Dict[str, Dict[str, str]]:
+    def _load_colors(self) -> Dict[str, ColorInfo]:
         """
         Load colors from colors.csv into a dictionary.
         
+        The parsed result is cached to disk, keyed by the CSV's mtime and
+        size, so later startups skip parsing the CSV entirely.
+        
         Returns:
             Dictionary mapping color_id to color information
         """
-        colors = {}
         
         try:
-            with open(self.colors_csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    colors[row['id']] = {
-                        'name': row['name'],
-                        'rgb': row['rgb'],
-                        'is_trans': row['is_trans'].lower() == 'true'
-                    }
+            stat = os.stat(self.colors_csv_path)
+            signature = (COLORS_CACHE_VERSION, stat.st_mtime, stat.st_size)
+            
+            cached = self._load_colors_cache(signature)
+            if cached is not None:
+                print(f"✓ Loaded {len(cached)} colors from {self.colors_cache_path}")
+                return cached
+            
+            with open(self.colors_csv_path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                id_i = header.index('id')
+                name_i = header.index('name')
+                rgb_i = header.index('rgb')
+                trans_i = header.index('is_trans')
+                
+                colors = {
+                    row[id_i]: ColorInfo(
+                        row[name_i],
+                        row[rgb_i],
+                        row[trans_i].lower() in ('t', 'true')
+                    )
+                    for row in reader
+                    if row
+                }
             
             print(f"✓ Loaded {len(colors)} colors from {self.colors_csv_path}")
+            self._save_colors_cache(signature, colors)
             return colors
             
         except Exception as e:
             print(f"Error loading colors.csv: {e}")
             return {}
     
-    def get_color_info(self, color_id: str) -> Optional[Dict[str, any]]:
+    def _load_colors_cache(self, signature: tuple) -> Optional[Dict[str, ColorInfo]]:
+        """
+        Load the parsed colors from the cache file if it is still valid.
+        
+        Args:
+            signature: (version, mtime, size) of the current colors.csv
+            
+        Returns:
+            Cached colors dictionary, or None if missing or stale
+        """
+        try:
+            with open(self.colors_cache_path, 'rb') as f:
+                cached_signature, colors = pickle.load(f)
+        except Exception:
+            return None
+        
+        if cached_signature != signature:
+            return None
+        
+        return colors
+    
+    def _save_colors_cache(self, signature: tuple, colors: Dict[str, ColorInfo]):
+        """
+        Write the parsed colors to the cache file.
+        
+        Args:
+            signature: (version, mtime, size) of the colors.csv that was parsed
+            colors: Parsed colors dictionary
+        """
+        try:
+            with open(self.colors_cache_path, 'wb') as f:
+                pickle.dump((signature, colors), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"⚠ Warning: Could not write colors cache: {e}")
+    
+    def get_color_info(self, color_id: str) -> Optional[ColorInfo]:
         """
         Get color information for a given color ID.
         
@@ -57,7 +166,7 @@ class MetadataHandler:
             color_id: The color ID as string
             
         Returns:
-            Dictionary with color info or None if not found
+            ColorInfo with name, rgb and is_trans, or None if not found
         """
         return self.colors_map.get(color_id)
     
@@ -85,7 +194,9 @@ class MetadataHandler:
         
         # Process parts with color information
         parts_with_colors = []
-        missing_colors = set()
+        
+        # Colors missing from our CSV, built once per ID from the API data
+        fallback_colors = {}
         
         for part in parts:
             # Handle nested API format: part has 'part', 'color', 'quantity' fields
@@ -97,31 +208,30 @@ class MetadataHandler:
             quantity = part.get('quantity', 1)
             is_spare = part.get('is_spare', False)
             
-            color_info = self.get_color_info(color_id)
+            color_info = self.get_color_info(color_id) or fallback_colors.get(color_id)
             
             # Use API color info if not in our CSV
             if not color_info:
-                missing_colors.add(color_id)
-                color_info = {
-                    'name': color_obj.get('name', 'Unknown'),
-                    'rgb': color_obj.get('rgb', '000000'),
-                    'is_trans': color_obj.get('is_trans', False)
-                }
+                color_info = fallback_colors[color_id] = ColorInfo(
+                    name=color_obj.get('name', 'Unknown'),
+                    rgb=color_obj.get('rgb', '000000'),
+                    is_trans=color_obj.get('is_trans', False)
+                )
             
             part_data = {
                 'part_num': part_num,
                 'color_id': color_id,
-                'color_name': color_info['name'],
-                'color_rgb': color_info['rgb'],
-                'is_transparent': color_info['is_trans'],
+                'color_name': color_info.name,
+                'color_rgb': color_info.rgb,
+                'is_transparent': color_info.is_trans,
                 'quantity': int(quantity) if isinstance(quantity, (int, float)) else 1,
                 'is_spare': is_spare
             }
             
             parts_with_colors.append(part_data)
         
-        if missing_colors:
-            print(f"⚠ Warning: Missing color data for IDs: {', '.join(missing_colors)}")
+        if fallback_colors:
+            print(f"⚠ Warning: Missing color data for IDs: {', '.join(fallback_colors)}")
         
         # Create the complete metadata structure
         set_data = {
@@ -135,11 +245,11 @@ class MetadataHandler:
             'parts': parts_with_colors
         }
         
-        # Write to .set.json
+        # Write to .set.json, plus a small summary for listing sets
         json_path = os.path.join(set_dir, '.set.json')
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(set_data, f, indent=2, ensure_ascii=False)
+            write_json(json_path, set_data)
+            write_json(os.path.join(set_dir, '.summary.json'), self._summarize(set_data))
             
             print(f"✓ Created metadata file: {json_path}")
             print(f"  - {set_data['total_parts']} total parts")
@@ -151,6 +261,44 @@ class MetadataHandler:
             print(f"Error creating metadata file: {e}")
             return False
     
+    def _load_cached_json(self, json_path: str, cache: OrderedDict, max_entries: int) -> Optional[Dict]:
+        """
+        Load a JSON file, reusing the parsed result while the file is unchanged.
+        
+        Parsed files are cached in memory and only re-read when the file's
+        mtime or size changes; the least recently used file is dropped once
+        the cache holds max_entries files.
+        
+        Args:
+            json_path: Path to the JSON file
+            cache: LRU cache to use
+            max_entries: Maximum number of files kept in the cache
+            
+        Returns:
+            Parsed data or None if the file does not exist
+        """
+        try:
+            stat = os.stat(json_path)
+        except FileNotFoundError:
+            with self._cache_lock:
+                cache.pop(json_path, None)
+            return None
+        
+        with self._cache_lock:
+            cached = cache.get(json_path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                cache.move_to_end(json_path)
+                return cached[2]
+        
+        data = read_json(json_path)
+        
+        with self._cache_lock:
+            cache[json_path] = (stat.st_mtime_ns, stat.st_size, data)
+            cache.move_to_end(json_path)
+            while len(cache) > max_entries:
+                cache.popitem(last=False)
+        return data
+    
     def load_set_metadata(self, set_number: str, output_dir: str = "sets") -> Optional[Dict]:
         """
         Load existing .set.json file for a set.
@@ -165,14 +313,64 @@ class MetadataHandler:
         json_path = os.path.join(output_dir, set_number, '.set.json')
         
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return None
+            return self._load_cached_json(json_path, self._metadata_cache, METADATA_CACHE_SIZE)
         except Exception as e:
             print(f"Error loading metadata: {e}")
             return None
     
+    def load_set_summary(self, set_number: str, output_dir: str = "sets") -> Optional[Dict]:
+        """
+        Load the small .summary.json file for a set, for listing sets.
+        
+        Sets created before summaries existed get one written from their
+        full metadata on first access.
+        
+        Args:
+            set_number: The LEGO set number
+            output_dir: Base directory for sets
+            
+        Returns:
+            Dictionary with set_number, name, total_parts and unique_parts,
+            or None if the set is not found
+        """
+        summary_path = os.path.join(output_dir, set_number, '.summary.json')
+        
+        try:
+            summary = self._load_cached_json(summary_path, self._summary_cache, SUMMARY_CACHE_SIZE)
+            if summary is not None:
+                return summary
+        except Exception as e:
+            print(f"Error loading set summary: {e}")
+        
+        metadata = self.load_set_metadata(set_number, output_dir)
+        if not metadata:
+            return None
+        
+        summary = self._summarize(metadata)
+        try:
+            write_json(summary_path, summary)
+        except Exception as e:
+            print(f"⚠ Warning: Could not write set summary: {e}")
+        
+        return summary
+    
+    def _summarize(self, set_data: Dict) -> Dict:
+        """
+        Extract the fields needed to list a set from its full metadata.
+        
+        Args:
+            set_data: Full set metadata
+            
+        Returns:
+            Summary dictionary
+        """
+        return {
+            'set_number': set_data['set_number'],
+            'name': set_data['name'],
+            'total_parts': set_data['total_parts'],
+            'unique_parts': set_data['unique_parts']
+        }
+    
     def set_exists(self, set_number: str, output_dir: str = "sets") -> bool:
         """
         Check if a set has already been processed.
@@ -202,12 +400,9 @@ class MetadataHandler:
         if not metadata:
             return []
         
-        # Get unique parts (same part can appear in multiple colors)
-        unique_parts = {}
-        for part in metadata['parts']:
-            part_num = part['part_num']
-            if part_num not in unique_parts:
-                unique_parts[part_num] = part
+        # Get unique parts (same part can appear in multiple colors); keys
+        # keep first-seen order, the entry kept is the part's last color
+        unique_parts = {part['part_num']: part for part in metadata['parts']}
         
         return list(unique_parts.values())
 
@@ -0,0 +1,153 @@
+"""
+Set processing pipeline shared by the web server and Celery workers.
+Holds the API client, metadata handler, STL converter and status store.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from rebrickable import RebrickableClient
+from metadata import MetadataHandler
+from converter import STLConverter
+from status import StatusStore
+
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Initialize modules
+metadata_handler = MetadataHandler()
+stl_converter = STLConverter()
+# Stop the persistent Perl workers when the process exits
+atexit.register(stl_converter.close)
+
+# Store processing status for sets (shared via Redis when REDIS_URL is set)
+processing_status = StatusStore(os.environ.get('REDIS_URL'))
+
+# Created on first use, see get_rebrickable_client()
+_rebrickable_client = None
+_rebrickable_client_lock = threading.Lock()
+
+
+def get_rebrickable_client() -> RebrickableClient:
+    """
+    Get this process's Rebrickable client, creating it on first use.
+    
+    The client isn't created at import because its response cache holds an
+    SQLite connection, which must not be shared with processes forked
+    afterwards (Celery's prefork pool imports this module before forking).
+    
+    Returns:
+        The shared RebrickableClient
+    """
+    global _rebrickable_client
+    
+    with _rebrickable_client_lock:
+        if _rebrickable_client is None:
+            _rebrickable_client = RebrickableClient()
+        return _rebrickable_client
+
+
+def process_set_background(set_number: str):
+    """
+    Background task to process a set.
+    
+    Args:
+        set_number: The LEGO set number
+    """
+    try:
+        # Update status
+        processing_status.update(
+            set_number,
+            message='Fetching set data from Rebrickable...',
+            progress=10
+        )
+        
+        # Step 1: Fetch data from Rebrickable. The set was normally validated
+        # just before, so its metadata is memoized and only the parts list
+        # needs to be requested
+        rebrickable_client = get_rebrickable_client()
+        metadata = rebrickable_client.validate_set(set_number)
+        if metadata is not None and metadata.inventory_id != set_number:
+            # Validation resolved a different set number; fetch this one's
+            metadata = None
+        data = rebrickable_client.fetch_set_data(set_number, metadata=metadata)
+        
+        if not data:
+            processing_status.update(
+                set_number,
+                status='failed',
+                message='Failed to fetch set data'
+            )
+            return
+        
+        # Update status
+        processing_status.update(
+            set_number,
+            message='Creating metadata file...',
+            progress=30
+        )
+        
+        # Step 2: Create metadata
+        success = metadata_handler.create_set_metadata(
+            set_number,
+            data['metadata'],
+            data['parts']
+        )
+        
+        if not success:
+            processing_status.update(
+                set_number,
+                status='failed',
+                message='Failed to create metadata'
+            )
+            return
+        
+        # Update status
+        processing_status.update(
+            set_number,
+            message='Converting parts to STL...',
+            progress=50
+        )
+        
+        # Step 3: Convert parts to STL
+        metadata = metadata_handler.load_set_metadata(set_number)
+        
+        def on_progress(done: int, total: int):
+            # Map conversion progress onto the 50-99% range
+            progress = 50 + (49 * done // total if total else 49)
+            processing_status.update(
+                set_number,
+                progress=progress,
+                message=f'Converting parts to STL ({done}/{total})...'
+            )
+        
+        stats = stl_converter.convert_set(
+            set_number,
+            metadata['parts'],
+            progress_callback=on_progress
+        )
+        
+        # Update final status
+        processing_status.update(
+            set_number,
+            status='completed',
+            progress=100,
+            message=f'Completed! Converted {stats["converted"]} parts',
+            stats=stats,
+            completed_at=datetime.now().isoformat()
+        )
+        
+    except Exception as e:
+        processing_status.update(
+            set_number,
+            status='failed',
+            message=f'Error: {str(e)}'
+        )
+        logger.error("Error processing set %s: %s", set_number, e)
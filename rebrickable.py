@@ -4,8 +4,223 @@ Uses the official API for set metadata and parts list.
 """
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 import os
-from typing import Optional, Dict, List
+import json
+import logging
+import re
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, List
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib decoder
+    orjson = None
+
+try:
+    import requests_cache
+except ImportError:  # Responses are not cached without it
+    requests_cache = None
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+except ImportError:  # Only needed for HTTP/2
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:  # Only needed for AsyncRebrickableClient
+    aiohttp = None
+
+try:
+    from aiohttp_client_cache import CachedSession as AsyncCachedSession, SQLiteBackend
+except ImportError:  # AsyncRebrickableClient does not cache without it
+    AsyncCachedSession = None
+
+logger = logging.getLogger(__name__)
+
+# Read REBRICKABLE_API_KEY from .env once, not per client
+load_dotenv()
+
+# Largest page_size the API accepts; larger values are capped server-side
+MAX_PAGE_SIZE = 1000
+
+# "gzip,deflate,br" when a brotli decoder is installed, else "gzip,deflate"
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+# Responses retried with backoff: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 0.3
+
+# Shape of a Rebrickable set number, e.g. "10245-1", "10245" or "fig-000001";
+# anything else can't exist and is rejected without a request
+SET_NUMBER_PATTERN = re.compile(r"[A-Za-z0-9]+(?:[-._][A-Za-z0-9]+)*")
+
+# Released sets don't change, so API responses can be cached for a long time
+CACHE_EXPIRE_AFTER = timedelta(days=30)
+
+
+def _loads(content: bytes) -> Dict[str, any]:
+    """Decode a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _fill_pages(
+    first_page: Dict[str, any],
+    pages: Iterable[List[Dict[str, str]]],
+    page_size: int
+) -> List[Dict[str, str]]:
+    """
+    Collect the results of consecutive parts pages into one list.
+    The list is sized from the first page's count and filled by slice.
+    Args:
+        first_page: Decoded first page
+        pages: Results of the pages after the first, in page order
+        page_size: Number of results per page
+    Returns:
+        List of all results
+    """
+    first_results = first_page.get("results", [])
+    pages = list(pages)
+    if any(len(results) != page_size for results in [first_results, *pages[:-1]]):
+        # A page came back short (the inventory changed while paging), so
+        # results don't line up with their slots; just join the pages
+        all_parts = list(first_results)
+        for results in pages:
+            all_parts.extend(results)
+        return all_parts
+
+    all_parts = [None] * max(first_page["count"], len(first_results) + len(pages) * page_size)
+    all_parts[:len(first_results)] = first_results
+    end = len(first_results)
+    for index, results in enumerate(pages, 1):
+        start = index * page_size
+        all_parts[start:start + len(results)] = results
+        end = start + len(results)
+    # Drop unused slots if the last page is shorter than count implied
+    del all_parts[end:]
+    return all_parts
+
+
+class TokenBucket:
+    """Thread-safe token bucket pacing requests to an average rate."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize a full bucket.
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens, i.e. the largest burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long to wait before it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now so concurrent callers queue up in order
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def acquire(self):
+        """Take one token, sleeping until it is available."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Take one token, waiting without blocking the event loop."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a token before sending each request."""
+
+    def __init__(self, limiter: TokenBucket, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        # Cached responses never reach the adapter, so they don't use up tokens
+        self.limiter.acquire()
+        return super().send(request, **kwargs)
+
+
+class SetMetadata:
+    """
+    Set metadata under the legacy keys, read straight from the API record.
+    Supports both attribute access and the dict-style access used by callers.
+    """
+
+    __slots__ = ("raw",)
+
+    # Keys available through metadata[key] and metadata.get(key)
+    KEYS = frozenset(("inventory_id", "name", "released", "inventory", "theme", "raw"))
+
+    def __init__(self, raw: Dict[str, any]):
+        self.raw = raw
+
+    @property
+    def inventory_id(self) -> str:
+        return self.raw.get("set_num", "")
+
+    @property
+    def name(self) -> str:
+        return self.raw.get("name", "")
+
+    @property
+    def released(self) -> any:
+        return self.raw.get("year", "")
+
+    @property
+    def inventory(self) -> any:
+        return self.raw.get("num_parts", "")
+
+    @property
+    def theme(self) -> any:
+        return self.raw.get("theme_id", "")
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self else default
+
+    def __repr__(self) -> str:
+        return f"SetMetadata({self.inventory_id!r}, {self.name!r})"
+
+
+def _set_number_candidates(set_number: str) -> List[str]:
+    """Set numbers to try when validating, in order of preference."""
+    # Try with -1 suffix if not present
+    if '-' not in set_number:
+        return [f"{set_number}-1"]
+    # If not found and already had a suffix, try without
+    return [set_number, set_number.split('-')[0]]
 
 
 class RebrickableClient:
@@ -13,123 +228,636 @@ class RebrickableClient:
 
     BASE_URL = "https://rebrickable.com/api/v3/lego"
     
-    def __init__(self, api_key: Optional[str] = None):
-        load_dotenv()
+    # Maximum number of parts pages fetched at once
+    MAX_PAGE_WORKERS = 8
+    
+    # Keep-alive connections kept per host; at least MAX_PAGE_WORKERS
+    POOL_SIZE = 16
+    
+    # Number of validate_set results remembered per client
+    VALIDATE_CACHE_SIZE = 1024
+    
+    # Rebrickable allows about one request per second on average, with bursts;
+    # clients sharing an API key share one bucket
+    RATE_LIMIT = 1.0
+    RATE_BURST = 10
+    
+    # Shared sessions keyed by (api_key, cache_path, http2) and rate limiters
+    # keyed by api_key
+    _sessions = {}
+    _limiters = {}
+    _sessions_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_path: Optional[str] = "rebrickable_cache",
+        http2: bool = False
+    ):
+        """
+        Initialize the API client.
+        Args:
+            api_key: Rebrickable API key (default: REBRICKABLE_API_KEY env variable)
+            cache_path: SQLite file for caching responses (requires requests-cache);
+                None disables caching
+            http2: Multiplex all requests over one HTTP/2 connection (requires
+                httpx[http2]); responses are then not cached
+        """
         self.api_key = api_key or os.environ.get("REBRICKABLE_API_KEY")
         if not self.api_key:
             raise ValueError("Rebrickable API key must be provided via parameter or REBRICKABLE_API_KEY env variable")
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Clients with the same key and options share one session, so its
+        # connection pool (and TLS sessions) serve the whole process
+        session_key = (self.api_key, cache_path, http2)
+        self.limiter = self.get_limiter(self.api_key)
+        with self._sessions_lock:
+            self.session = self._sessions.get(session_key)
+            if self.session is None:
+                self.session = self._sessions[session_key] = self._build_session(cache_path, http2)
+        self.cached = requests_cache is not None and isinstance(self.session, requests_cache.CachedSession)
+        # Per instance so the cache never outlives the client or its API key;
+        # clear with client._resolve_set.cache_clear()
+        self._resolve_set = lru_cache(maxsize=self.VALIDATE_CACHE_SIZE)(self._resolve_set)
+
+    @classmethod
+    def get_limiter(cls, api_key: str) -> TokenBucket:
+        """
+        Get the rate limiter shared by all clients, sync or async, using an API key.
+        Args:
+            api_key: Rebrickable API key
+        Returns:
+            The key's token bucket
+        """
+        with cls._sessions_lock:
+            limiter = cls._limiters.get(api_key)
+            if limiter is None:
+                limiter = cls._limiters[api_key] = TokenBucket(cls.RATE_LIMIT, cls.RATE_BURST)
+            return limiter
+
+    def _build_session(self, cache_path: Optional[str], http2: bool):
+        """
+        Create an HTTP session with the API headers, connection pooling, rate
+        limiting and retries.
+        Args:
+            cache_path: SQLite file for caching responses, or None
+            http2: Use an httpx HTTP/2 client if httpx is installed
+        Returns:
+            An httpx client for HTTP/2, a cached requests session if requests-cache
+            is installed and cache_path is set, else a plain requests session
+        """
+        headers = {
             "Authorization": f"key {self.api_key}",
             "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
             "User-Agent": "ldraw2stl/lego-experiments"
-        })
+        }
+        if http2 and httpx is not None:
+            # Concurrent page fetches share one connection instead of one each;
+            # the transport only retries failed connection attempts
+            return httpx.Client(
+                headers=headers,
+                transport=httpx.HTTPTransport(http2=True, retries=3),
+                timeout=30.0
+            )
+        if http2:
+            logger.warning("⚠ Warning: httpx[http2] is not installed, falling back to HTTP/1.1")
 
-    def get_set_metadata(self, set_number: str) -> Optional[Dict[str, any]]:
+        if cache_path and requests_cache is not None:
+            session = requests_cache.CachedSession(
+                cache_path,
+                backend="sqlite",
+                expire_after=CACHE_EXPIRE_AFTER,
+                allowable_codes=(200,),
+                allowable_methods=("GET",)
+            )
+        else:
+            session = requests.Session()
+        session.headers.update(headers)
+        session.headers["Connection"] = "keep-alive"
+        # Reuse connections across concurrent page fetches, pace requests and
+        # retry the occasional 429 and transient server errors with backoff
+        adapter = RateLimitedAdapter(
+            self.limiter,
+            pool_connections=self.POOL_SIZE,
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        return session
+
+    def _get(self, url: str, params: Optional[Dict] = None, force_refresh: bool = False):
+        """
+        Send a GET request through the requests or httpx session.
+        Args:
+            url: Request URL
+            params: Query parameters
+            force_refresh: Ignore any cached response and refresh the cache
+        Returns:
+            The response
+        """
+        if not isinstance(self.session, requests.Session):
+            # httpx has no adapter to pace requests in
+            self.limiter.acquire()
+        if force_refresh and self.cached:
+            return self.session.get(url, params=params, force_refresh=True)
+        return self.session.get(url, params=params)
+
+    def get_set_metadata(self, set_number: str, force_refresh: bool = False) -> Optional[SetMetadata]:
         """
         Fetch set metadata from the API.
         Args:
             set_number: The LEGO set number (e.g., "10245-1")
+            force_refresh: Ignore any cached response
         Returns:
-            Dictionary with metadata or None if not found
+            SetMetadata or None if not found
         """
-        url = f"{self.BASE_URL}/sets/{set_number}/"
         try:
-            resp = self.session.get(url)
-            if resp.status_code == 404:
-                print(f"Set {set_number} not found")
-                return None
-            resp.raise_for_status()
-            data = resp.json()
-            # Map to legacy keys for compatibility
-            metadata = {
-                'inventory_id': data.get('set_num', ''),
-                'name': data.get('name', ''),
-                'released': data.get('year', ''),
-                'inventory': data.get('num_parts', ''),
-                'theme': data.get('theme_id', ''),
-                'raw': data
-            }
-            return metadata
+            return self._request_set_metadata(set_number, force_refresh)
         except Exception as e:
-            print(f"Error fetching set metadata: {e}")
+            logger.error("Error fetching set metadata: %s", e)
             return None
 
-    def get_parts_list(self, set_number: str, page_size: int = 1000) -> Optional[List[Dict[str, str]]]:
+    def _request_set_metadata(self, set_number: str, force_refresh: bool = False) -> Optional[SetMetadata]:
+        """
+        Fetch set metadata from the API, raising on errors other than not found.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1")
+            force_refresh: Ignore any cached response
+        Returns:
+            SetMetadata or None if not found
+        """
+        url = f"{self.BASE_URL}/sets/{set_number}/"
+        resp = self._get(url, force_refresh=force_refresh)
+        if resp.status_code == 404:
+            logger.info("Set %s not found", set_number)
+            return None
+        resp.raise_for_status()
+        # Exposed under the legacy keys for compatibility
+        return SetMetadata(_loads(resp.content))
+
+    def _fetch_page(self, url: str, page: int, page_size: int, force_refresh: bool = False) -> Dict[str, any]:
+        """
+        Fetch one page of a paginated API endpoint.
+        Args:
+            url: Endpoint URL
+            page: Page number (1-based)
+            page_size: Number of results per page
+            force_refresh: Ignore any cached response
+        Returns:
+            Decoded JSON response
+        """
+        resp = self._get(url, params={"page": page, "page_size": page_size}, force_refresh=force_refresh)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    def _fetch_results(self, url: str, page: int, page_size: int, force_refresh: bool = False) -> List[Dict[str, str]]:
+        """
+        Fetch the results of one page of a paginated API endpoint.
+        Only the results are kept, so the rest of the page is freed right away.
+        Args:
+            url: Endpoint URL
+            page: Page number (1-based)
+            page_size: Number of results per page
+            force_refresh: Ignore any cached response
+        Returns:
+            List of results on the page
+        """
+        return self._fetch_page(url, page, page_size, force_refresh).get("results", [])
+
+    def get_parts_list(
+        self,
+        set_number: str,
+        page_size: int = MAX_PAGE_SIZE,
+        force_refresh: bool = False
+    ) -> Optional[List[Dict[str, str]]]:
         """
         Download the parts list for the given set number.
+        The first page gives the total count; remaining pages are fetched concurrently.
         Args:
             set_number: The LEGO set number (e.g., "10245-1")
-            page_size: Number of results per page (default: 1000)
+            page_size: Number of results per page (default and maximum: 1000)
+            force_refresh: Ignore any cached responses
         Returns:
             List of dictionaries representing the parts
         """
         url = f"{self.BASE_URL}/sets/{set_number}/parts/"
-        params = {"page": 1, "page_size": page_size}
-        all_parts = []
+        # Page numbers are planned from page_size, so it must match what the API returns
+        page_size = min(page_size, MAX_PAGE_SIZE)
         try:
-            while True:
-                resp = self.session.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
-                results = data.get("results", [])
-                all_parts.extend(results)
-                if not data.get("next"):
-                    break
-                params["page"] += 1
-            return all_parts
+            data = self._fetch_page(url, 1, page_size, force_refresh)
+            count = data.get("count")
+            if not data.get("next") or (count is not None and count <= page_size):
+                return data.get("results", [])
+
+            if count is None:
+                # No total to plan with, follow the pages one by one
+                all_parts = list(data.get("results", []))
+                page = 1
+                while data.get("next"):
+                    page += 1
+                    data = self._fetch_page(url, page, page_size, force_refresh)
+                    all_parts.extend(data.get("results", []))
+                return all_parts
+
+            num_pages = -(-count // page_size)
+            workers = min(self.MAX_PAGE_WORKERS, num_pages - 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() yields in page order, so parts keep the API's order
+                pages = executor.map(
+                    lambda page: self._fetch_results(url, page, page_size, force_refresh),
+                    range(2, num_pages + 1)
+                )
+                return _fill_pages(data, pages, page_size)
         except Exception as e:
-            print(f"Error fetching parts list: {e}")
+            if getattr(getattr(e, "response", None), "status_code", None) == 404:
+                # Expected when fetched alongside the metadata of a missing set
+                logger.info("Parts list for set %s not found", set_number)
+                return None
+            logger.error("Error fetching parts list: %s", e)
             return None
 
-    def fetch_set_data(self, set_number: str) -> Optional[Dict[str, any]]:
+    def fetch_set_data(
+        self,
+        set_number: str,
+        force_refresh: bool = False,
+        metadata: Optional[SetMetadata] = None
+    ) -> Optional[Dict[str, any]]:
         """
         Complete workflow: fetch metadata and download parts list.
+        The metadata and the parts list are requested concurrently; if the
+        metadata is passed in (e.g. from validate_set), only the parts list is.
         Args:
             set_number: The LEGO set number (e.g., "10245-1")
+            force_refresh: Ignore cached responses and fetch fresh data
+            metadata: Metadata already fetched for this set number, if any
         Returns:
             Dictionary containing 'metadata' and 'parts' or None if failed
         """
-        metadata = self.get_set_metadata(set_number)
+        if metadata is not None:
+            parts = self.get_parts_list(set_number, force_refresh=force_refresh)
+        else:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                metadata_future = executor.submit(self.get_set_metadata, set_number, force_refresh)
+                parts_future = executor.submit(self.get_parts_list, set_number, force_refresh=force_refresh)
+                metadata = metadata_future.result()
+                parts = parts_future.result()
         if not metadata:
             return None
-        print(f"✓ Fetched metadata: {metadata['name']} (Set: {set_number})")
-        parts = self.get_parts_list(set_number)
+        logger.info("✓ Fetched metadata: %s (Set: %s)", metadata['name'], set_number)
         if not parts:
-            print(f"Could not fetch parts list for set {set_number}")
+            logger.error("Could not fetch parts list for set %s", set_number)
             return None
-        print(f"✓ Downloaded {len(parts)} parts")
+        logger.info("✓ Downloaded %d parts", len(parts))
         return {
             'metadata': metadata,
             'parts': parts,
             'set_number': set_number
         }
 
-    def validate_set(self, set_number: str) -> Optional[Dict[str, any]]:
+    def validate_set(self, set_number: str) -> Optional[SetMetadata]:
         """
         Validate if a LEGO set exists using the API.
         Args:
             set_number: The LEGO set number (e.g., "10245-1" or "10245")
         Returns:
-            Metadata dict if found, else None
+            SetMetadata if found, else None
         """
-        # Try with -1 suffix if not present
-        if '-' not in set_number:
-            set_number_full = f"{set_number}-1"
-        else:
-            set_number_full = set_number
-        metadata = self.get_set_metadata(set_number_full)
-        if metadata:
-            return metadata
-        # If not found and already had -1, try without
-        if '-' in set_number:
-            base_num = set_number.split('-')[0]
-            metadata = self.get_set_metadata(base_num)
+        if not SET_NUMBER_PATTERN.fullmatch(set_number):
+            logger.info("Set %r not found (invalid set number)", set_number)
+            return None
+        try:
+            return self._resolve_set(set_number)
+        except Exception:
+            return None
+
+    def validate_sets(self, set_numbers: List[str], max_workers: int = 8) -> Dict[str, Optional[SetMetadata]]:
+        """
+        Validate several LEGO sets concurrently.
+        Args:
+            set_numbers: The LEGO set numbers (e.g., ["10245-1", "10246"])
+            max_workers: Maximum number of sets looked up at once
+        Returns:
+            Dictionary mapping each set number to its metadata, or None if not found
+        """
+        if not set_numbers:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(set_numbers))) as executor:
+            return dict(zip(set_numbers, executor.map(self.validate_set, set_numbers)))
+
+    def _resolve_set(self, set_number: str) -> Optional[SetMetadata]:
+        """
+        Look up the first candidate set number that exists.
+        Results are memoized per client; errors are raised instead so that a
+        failed lookup is retried on the next call rather than cached.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1" or "10245")
+        Returns:
+            SetMetadata if found, else None
+        """
+        error = None
+        for candidate in _set_number_candidates(set_number):
+            try:
+                metadata = self._request_set_metadata(candidate)
+            except Exception as e:
+                logger.error("Error fetching set metadata: %s", e)
+                error = e
+                continue
             if metadata:
                 return metadata
+        if error is not None:
+            raise error
         return None
 
+
+def _forget_sessions_after_fork():
+    """Make a forked child build its own sessions instead of the parent's."""
+    # Their connection pools and SQLite cache connections belong to the parent
+    RebrickableClient._sessions = {}
+    RebrickableClient._sessions_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows
+    os.register_at_fork(after_in_child=_forget_sessions_after_fork)
+
+
+class AsyncRebrickableClient:
+    """Asynchronous client for the Rebrickable API (requires the optional aiohttp package)."""
+
+    BASE_URL = RebrickableClient.BASE_URL
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_connections: int = 16,
+        cache_path: Optional[str] = "rebrickable_async_cache"
+    ):
+        """
+        Initialize the API client.
+        Args:
+            api_key: Rebrickable API key (default: REBRICKABLE_API_KEY env variable)
+            max_connections: Maximum number of concurrent connections
+            cache_path: SQLite file for caching responses (requires aiohttp-client-cache);
+                None disables caching
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncRebrickableClient")
+        self.api_key = api_key or os.environ.get("REBRICKABLE_API_KEY")
+        if not self.api_key:
+            raise ValueError("Rebrickable API key must be provided via parameter or REBRICKABLE_API_KEY env variable")
+        self.max_connections = max_connections
+        self.cache_path = cache_path
+        self.limiter = RebrickableClient.get_limiter(self.api_key)
+        self._session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Create the HTTP session on first use, inside the running event loop."""
+        if self._session is None or self._session.closed:
+            options = {
+                "headers": {
+                    "Authorization": f"key {self.api_key}",
+                    "Accept": "application/json",
+                    "Accept-Encoding": ACCEPT_ENCODING,
+                    "User-Agent": "ldraw2stl/lego-experiments"
+                },
+                "connector": aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=75),
+                "timeout": aiohttp.ClientTimeout(total=30),
+                "trace_configs": [self._pacing_trace()]
+            }
+            if self.cache_path and AsyncCachedSession is not None:
+                cache = SQLiteBackend(
+                    self.cache_path,
+                    expire_after=CACHE_EXPIRE_AFTER,
+                    allowed_codes=(200,),
+                    allowed_methods=("GET",)
+                )
+                self._session = AsyncCachedSession(cache=cache, **options)
+            else:
+                self._session = aiohttp.ClientSession(**options)
+        return self._session
+
+    def _pacing_trace(self) -> "aiohttp.TraceConfig":
+        """Trace config that takes a rate limiter token before each request is sent."""
+        async def on_request_start(session, context, params):
+            # Cached responses never start a request, so they don't use up tokens
+            await self.limiter.acquire_async()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        return trace_config
+
+    async def _get_json(self, url: str, params: Optional[Dict] = None) -> Optional[Dict[str, any]]:
+        """
+        Send a GET request and decode the JSON response, retrying rate limiting
+        and transient server errors with backoff like the sync client.
+        Args:
+            url: Request URL
+            params: Query parameters
+        Returns:
+            Decoded JSON response, or None if not found (404)
+        """
+        for attempt in range(RETRY_TOTAL + 1):
+            async with self._get_session().get(url, params=params) as resp:
+                if resp.status not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                    if resp.status == 404:
+                        return None
+                    resp.raise_for_status()
+                    return _loads(await resp.read())
+                delay = RETRY_BACKOFF * 2 ** attempt
+                retry_after = resp.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncRebrickableClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get_set_metadata(self, set_number: str) -> Optional[SetMetadata]:
+        """
+        Fetch set metadata from the API.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1")
+        Returns:
+            SetMetadata or None if not found
+        """
+        url = f"{self.BASE_URL}/sets/{set_number}/"
+        try:
+            data = await self._get_json(url)
+            if data is None:
+                logger.info("Set %s not found", set_number)
+                return None
+            return SetMetadata(data)
+        except Exception as e:
+            logger.error("Error fetching set metadata: %s", e)
+            return None
+
+    def _parts_url(self, set_number: str) -> str:
+        """Parts list endpoint URL for a set."""
+        return f"{self.BASE_URL}/sets/{set_number}/parts/"
+
+    async def _fetch_page(self, url: str, page: int, page_size: int = MAX_PAGE_SIZE) -> Dict[str, any]:
+        """
+        Fetch one page of a paginated API endpoint.
+        Args:
+            url: Endpoint URL
+            page: Page number (1-based)
+            page_size: Number of results per page
+        Returns:
+            Decoded JSON response
+        """
+        data = await self._get_json(url, params={"page": page, "page_size": page_size})
+        if data is None:
+            raise LookupError(f"{url} not found")
+        return data
+
+    async def _fetch_results(self, url: str, page: int, page_size: int) -> List[Dict[str, str]]:
+        """
+        Fetch the results of one page of a paginated API endpoint.
+        Only the results are kept, so the rest of the page is freed right away.
+        Args:
+            url: Endpoint URL
+            page: Page number (1-based)
+            page_size: Number of results per page
+        Returns:
+            List of results on the page
+        """
+        return (await self._fetch_page(url, page, page_size)).get("results", [])
+
+    async def get_parts_list(
+        self,
+        set_number: str,
+        page_size: int = MAX_PAGE_SIZE,
+        first_page: Optional[Dict[str, any]] = None
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Download the parts list for the given set number.
+        Pages after the first are fetched concurrently.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1")
+            page_size: Number of results per page (default and maximum: 1000)
+            first_page: Already fetched first page, if any
+        Returns:
+            List of dictionaries representing the parts
+        """
+        url = self._parts_url(set_number)
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        try:
+            data = first_page or await self._fetch_page(url, 1, page_size)
+            count = data.get("count")
+            if not data.get("next") or (count is not None and count <= page_size):
+                return data.get("results", [])
+
+            if count is None:
+                # No total to plan with, follow the pages one by one
+                all_parts = list(data.get("results", []))
+                page = 1
+                while data.get("next"):
+                    page += 1
+                    data = await self._fetch_page(url, page, page_size)
+                    all_parts.extend(data.get("results", []))
+                return all_parts
+
+            # The connector's connection limit bounds how many run at once
+            num_pages = -(-count // page_size)
+            pages = await asyncio.gather(*(
+                self._fetch_results(url, page, page_size)
+                for page in range(2, num_pages + 1)
+            ))
+            return _fill_pages(data, pages, page_size)
+        except LookupError:
+            logger.info("Parts list for set %s not found", set_number)
+            return None
+        except Exception as e:
+            logger.error("Error fetching parts list: %s", e)
+            return None
+
+    async def fetch_set_data(
+        self,
+        set_number: str,
+        metadata: Optional[SetMetadata] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Complete workflow: fetch metadata and download parts list.
+        The metadata and the first parts page are requested concurrently; if
+        the metadata is passed in (e.g. from validate_set), only the parts are.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1")
+            metadata: Metadata already fetched for this set number, if any
+        Returns:
+            Dictionary containing 'metadata' and 'parts' or None if failed
+        """
+        if metadata is not None:
+            first_page = None
+        else:
+            metadata, first_page = await asyncio.gather(
+                self.get_set_metadata(set_number),
+                self._fetch_page(self._parts_url(set_number), 1),
+                return_exceptions=True
+            )
+        if not metadata or isinstance(metadata, BaseException):
+            return None
+        logger.info("✓ Fetched metadata: %s (Set: %s)", metadata['name'], set_number)
+        if isinstance(first_page, BaseException):
+            # Let get_parts_list retry the first page and report errors
+            first_page = None
+        parts = await self.get_parts_list(set_number, first_page=first_page)
+        if not parts:
+            logger.error("Could not fetch parts list for set %s", set_number)
+            return None
+        logger.info("✓ Downloaded %d parts", len(parts))
+        return {
+            'metadata': metadata,
+            'parts': parts,
+            'set_number': set_number
+        }
+
+    async def validate_set(self, set_number: str) -> Optional[SetMetadata]:
+        """
+        Validate if a LEGO set exists using the API.
+        All candidate set numbers are looked up concurrently.
+        Args:
+            set_number: The LEGO set number (e.g., "10245-1" or "10245")
+        Returns:
+            SetMetadata if found, else None
+        """
+        if not SET_NUMBER_PATTERN.fullmatch(set_number):
+            logger.info("Set %r not found (invalid set number)", set_number)
+            return None
+        results = await asyncio.gather(*(
+            self.get_set_metadata(candidate)
+            for candidate in _set_number_candidates(set_number)
+        ))
+        # Prefer the first candidate that exists
+        return next((metadata for metadata in results if metadata), None)
+
+    async def validate_sets(self, set_numbers: List[str]) -> Dict[str, Optional[SetMetadata]]:
+        """
+        Validate several LEGO sets concurrently.
+        The connector's connection limit bounds how many requests run at once.
+        Args:
+            set_numbers: The LEGO set numbers (e.g., ["10245-1", "10246"])
+        Returns:
+            Dictionary mapping each set number to its metadata, or None if not found
+        """
+        results = await asyncio.gather(*(self.validate_set(set_number) for set_number in set_numbers))
+        return dict(zip(set_numbers, results))
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     # Test the API client with set 10245-1
     import sys
     set_num = "10245-1"
@@ -0,0 +1,137 @@
+"""
+Processing status store for sets being converted.
+Keeps status in memory, or in Redis so it is shared between worker processes.
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Optional
+
+try:
+    import redis
+except ImportError:  # Only needed when a Redis URL is configured
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatusStore:
+    """Thread-safe store for per-set processing status."""
+    
+    KEY_PREFIX = "lego-to-stl:status:"
+    
+    # Redis entries of finished sets are kept for a day
+    EXPIRE_SECONDS = 24 * 60 * 60
+    
+    # Entries of sets still processing expire unless refreshed by update(),
+    # so a set whose worker died can be resubmitted; the pipeline updates
+    # at least once per converted part
+    PROCESSING_EXPIRE_SECONDS = 10 * 60
+    
+    FINAL_STATUSES = ('completed', 'failed')
+    
+    def __init__(self, redis_url: Optional[str] = None):
+        """
+        Initialize the status store.
+        
+        Args:
+            redis_url: Redis connection URL; in-memory storage is used if not set
+        """
+        self._lock = threading.Lock()
+        self._statuses = {}
+        self._redis = None
+        
+        if redis_url:
+            if redis is None:
+                logger.warning("⚠ Warning: REDIS_URL is set but redis is not installed, using in-memory status")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+    
+    def _key(self, set_number: str) -> str:
+        return f"{self.KEY_PREFIX}{set_number}"
+    
+    def _expire_seconds(self, fields: Dict) -> int:
+        """Redis TTL after writing fields: short until the set has finished."""
+        if fields.get('status') in self.FINAL_STATUSES:
+            return self.EXPIRE_SECONDS
+        return self.PROCESSING_EXPIRE_SECONDS
+    
+    def get(self, set_number: str) -> Optional[Dict]:
+        """
+        Get a snapshot of the processing status for a set.
+        
+        Args:
+            set_number: The LEGO set number
+        
+        Returns:
+            Copy of the status dictionary or None if unknown
+        """
+        if self._redis is not None:
+            fields = self._redis.hgetall(self._key(set_number))
+            if not fields:
+                return None
+            return {key.decode(): json.loads(value) for key, value in fields.items()}
+        
+        with self._lock:
+            status = self._statuses.get(set_number)
+            return dict(status) if status is not None else None
+    
+    def start(self, set_number: str, status: Dict) -> bool:
+        """
+        Record a new status for a set unless it is already processing.
+        
+        Args:
+            set_number: The LEGO set number
+            status: Initial status dictionary
+        
+        Returns:
+            True if the status was recorded, False if already processing
+        """
+        if self._redis is not None:
+            key = self._key(set_number)
+            with self._redis.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    current = pipe.hget(key, 'status')
+                    if current is not None and json.loads(current) == 'processing':
+                        return False
+                    
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.hset(key, mapping={k: json.dumps(v) for k, v in status.items()})
+                    pipe.expire(key, self._expire_seconds(status))
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    # Another worker started this set at the same time
+                    return False
+        
+        with self._lock:
+            current = self._statuses.get(set_number)
+            if current is not None and current.get('status') == 'processing':
+                return False
+            
+            self._statuses[set_number] = dict(status)
+            return True
+    
+    def update(self, set_number: str, **fields):
+        """
+        Update fields of the status for a set.
+        
+        Args:
+            set_number: The LEGO set number
+            **fields: Status fields to set
+        """
+        if self._redis is not None:
+            key = self._key(set_number)
+            with self._redis.pipeline() as pipe:
+                pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+                pipe.expire(key, self._expire_seconds(fields))
+                pipe.execute()
+            return
+        
+        with self._lock:
+            # Replace the whole dict so readers never see a partial update
+            self._statuses[set_number] = {**self._statuses.get(set_number, {}), **fields}
@@ -0,0 +1,44 @@
+"""
+Celery tasks for processing LEGO sets outside the web server.
+Used when CELERY_BROKER_URL and REDIS_URL are set; otherwise sets are
+processed in a thread.
+
+Run a worker with:
+    celery -A tasks worker --loglevel=info
+"""
+
+import os
+
+from celery import Celery
+from dotenv import load_dotenv
+
+from pipeline import process_set_background
+
+load_dotenv()
+
+celery = Celery(
+    'lego-to-stl',
+    broker=os.environ.get('CELERY_BROKER_URL'),
+    backend=os.environ.get('CELERY_RESULT_BACKEND')
+)
+
+# Conversions run for minutes; only acknowledge once finished, and requeue
+# the task if its worker process is killed, so the set is processed again
+# by another worker instead of being dropped
+celery.conf.task_acks_late = True
+celery.conf.task_reject_on_worker_lost = True
+celery.conf.worker_prefetch_multiplier = 1
+
+
+@celery.task(name='tasks.process_set')
+def process_set_task(set_number: str):
+    """
+    Process a LEGO set in a Celery worker.
+    
+    Progress is reported through the shared status store, so REDIS_URL
+    must be set for the web server to see it.
+    
+    Args:
+        set_number: The LEGO set number
+    """
+    process_set_background(set_number)